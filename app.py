@@ -1,23 +1,36 @@
 import os
-import json
+import asyncio
+import atexit
 import hashlib
+import hmac
 import logging
-import secrets
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from pathlib import Path
 from functools import wraps
-
-from flask import (
-    Flask, render_template, request, jsonify, session,
+from logging.handlers import QueueHandler, QueueListener
+
+import anthropic
+import httpx
+import orjson
+from cachetools import TTLCache
+from hypercorn.middleware import ProxyFixMiddleware
+from quart import (
+    Quart, render_template, request, jsonify, session,
     redirect, url_for, flash, Response
 )
-from werkzeug.middleware.proxy_fix import ProxyFix
+from openai import AsyncOpenAI
 
-app = Flask(__name__)
+# Quart is the asyncio implementation of the Flask API. Running as an
+# ASGI app lets one worker multiplex many in-flight LLM streams instead
+# of pinning a thread to each one for the whole reply.
+app = Quart(__name__)
 
-# Render (and most PaaS) run behind a reverse proxy — ProxyFix lets
-# Flask read X-Forwarded-* headers so it knows the real scheme/host.
-app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+# Render (and most PaaS) run behind a reverse proxy — ProxyFixMiddleware
+# lets Quart read X-Forwarded-* headers so it knows the real scheme/host.
+app.asgi_app = ProxyFixMiddleware(app.asgi_app, mode="legacy", trusted_hops=1)
 
 # SECRET_KEY must be consistent across workers and restarts.
 # Best practice: set SECRET_KEY env var on Render. Fallback derives a
@@ -32,35 +45,108 @@ app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(hours=24)
 
-# Static asset settings
-app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 0
-app.config["CACHE_BUST"] = secrets.token_hex(4)
-
-# Logging
-logging.basicConfig(level=logging.INFO)
+# Streamed replies can run well past Quart's 60s default.
+app.config["RESPONSE_TIMEOUT"] = 300
+
+# Static asset settings. Browsers may cache assets for a year; templates
+# append ?v=CACHE_BUST, a fingerprint of the static files, so any change
+# to them still yields new URLs. Hashing the content (rather than a random
+# token) keeps the URLs identical across workers and restarts.
+def _static_fingerprint():
+    digest = hashlib.sha256()
+    static_dir = Path(app.static_folder)
+    for path in sorted(static_dir.rglob("*")):
+        if path.is_file():
+            digest.update(str(path.relative_to(static_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:8]
+
+
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 31536000
+app.config["CACHE_BUST"] = _static_fingerprint()
+app.jinja_env.globals["CACHE_BUST"] = app.config["CACHE_BUST"]
+
+# Logging — records go through a queue to a background listener thread,
+# so request handlers never block on a stderr write.
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Configuration
 SITE_PASSWORD = os.environ.get("SITE_PASSWORD", "transform2024")
+SITE_PASSWORD_BYTES = SITE_PASSWORD.encode()
 AI_PROVIDER = os.environ.get("AI_PROVIDER", "anthropic")  # "anthropic" or "openai"
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o")
 ANTHROPIC_MODEL = os.environ.get("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 1024))  # 0 disables
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 3600))  # seconds
 
 # Startup diagnostics
 logger.info("AI_PROVIDER=%s", AI_PROVIDER)
 logger.info("ANTHROPIC_API_KEY configured: %s", bool(ANTHROPIC_API_KEY))
 logger.info("OPENAI_API_KEY configured: %s", bool(OPENAI_API_KEY))
 
-# Load persona data
-PERSONA_DIR = Path(__file__).parent / "persona_data"
-PERSONAS = {}
 
-for json_file in sorted(PERSONA_DIR.glob("*.json")):
-    with open(json_file, "r") as f:
-        data = json.load(f)
-        PERSONAS[data["persona_id"]] = data
+def _resolve_provider():
+    """Pick the effective provider and the error to return if it has no key."""
+    provider = AI_PROVIDER.lower()
+
+    # Auto-detect provider based on available keys
+    if provider == "openai" and not OPENAI_API_KEY:
+        if ANTHROPIC_API_KEY:
+            provider = "anthropic"
+    elif provider == "anthropic" and not ANTHROPIC_API_KEY:
+        if OPENAI_API_KEY:
+            provider = "openai"
+
+    api_key = {"anthropic": ANTHROPIC_API_KEY, "openai": OPENAI_API_KEY}.get(provider, "")
+
+    # Validate that the selected provider has an API key
+    error = None
+    if provider == "anthropic" and not api_key:
+        error = ({"error": "The Claude API key is not configured. Please set ANTHROPIC_API_KEY in the environment."}, 503)
+    elif provider == "openai" and not api_key:
+        error = ({"error": "The OpenAI API key is not configured. Please set OPENAI_API_KEY in the environment."}, 503)
+    return provider, api_key, error
+
+
+# All inputs are fixed at startup, so the provider is resolved exactly once.
+RESOLVED_PROVIDER, RESOLVED_API_KEY, PROVIDER_ERROR = _resolve_provider()
+logger.info("Resolved AI provider: %s", RESOLVED_PROVIDER)
+
+
+# Upstream API clients — one long-lived client per provider, so every
+# chat reuses a warm keep-alive pool instead of a fresh TLS handshake.
+# Both share a single HTTP/2 connection pool sized for bursts of
+# concurrent streams; HTTP/2 lets many streams share one socket.
+_shared_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=500,
+        max_keepalive_connections=200,
+        keepalive_expiry=60.0,
+    ),
+    http2=True,
+    timeout=httpx.Timeout(connect=5.0, read=120.0, write=10.0, pool=5.0),
+)
+
+_anthropic_client = anthropic.AsyncAnthropic(
+    api_key=ANTHROPIC_API_KEY, http_client=_shared_http_client
+) if ANTHROPIC_API_KEY else None
+_openai_client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY, http_client=_shared_http_client
+) if OPENAI_API_KEY else None
+
+
+@app.after_serving
+async def close_api_clients():
+    """Drain the pooled upstream connections on graceful shutdown."""
+    await _shared_http_client.aclose()
+
 
 # System prompt template
 SYSTEM_PROMPT_TEMPLATE = """You are Persona Simulator, a synthetic persona simulation engine.
@@ -118,68 +204,235 @@ If there is ambiguity, default to the persona's primary objectives and decision
 {dossier}
 --- END DOSSIER ---"""
 
+# Load persona data. Each persona's system prompt is static, so it is
+# rendered once here rather than on every chat request. The full dossier
+# only lives on inside that prompt; PERSONAS keeps just the display fields
+# the templates render.
+PERSONA_DIR = Path(__file__).parent / "persona_data"
+PERSONA_META_FIELDS = (
+    "persona_id", "name", "role", "type", "professionalism_level",
+    "tagline", "avatar_initials", "representative_quote",
+)
+PERSONAS = {}
+PERSONA_PROMPTS = {}
+
+# A single scandir pass lists the directory without a stat per file.
+with os.scandir(PERSONA_DIR) as it:
+    persona_files = sorted(
+        (entry for entry in it if entry.name.endswith(".json") and entry.is_file()),
+        key=lambda entry: entry.name,
+    )
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# Reads release the GIL, so a small pool overlaps the file I/O on cold start.
+with ThreadPoolExecutor(max_workers=8) as pool:
+    raw_personas = list(pool.map(_read_bytes, (entry.path for entry in persona_files)))
+
+for raw in raw_personas:
+    data = orjson.loads(raw)
+    PERSONAS[data["persona_id"]] = {
+        field: data[field] for field in PERSONA_META_FIELDS if field in data
+    }
+    # Compact JSON: the model reads it just as well without indentation,
+    # and it saves a sizeable share of the prompt's input tokens.
+    PERSONA_PROMPTS[data["persona_id"]] = SYSTEM_PROMPT_TEMPLATE.format(
+        dossier=orjson.dumps(data).decode()
+    )
 
-def login_required(f):
+
+def web_login_required(f):
+    """Guard a page route: unauthenticated visitors go to the login page."""
     @wraps(f)
-    def decorated_function(*args, **kwargs):
+    async def decorated_function(*args, **kwargs):
         if not session.get("authenticated"):
-            # Return JSON 401 for AJAX/API requests instead of a redirect
-            if request.is_json or request.headers.get("Content-Type") == "application/json":
-                return jsonify({"error": "Session expired. Please refresh the page and log in again."}), 401
             return redirect(url_for("login"))
-        return f(*args, **kwargs)
+        return await f(*args, **kwargs)
+    return decorated_function
+
+
+def api_login_required(f):
+    """Guard an /api/* route: unauthenticated calls get a JSON 401, not a redirect."""
+    @wraps(f)
+    async def decorated_function(*args, **kwargs):
+        if not session.get("authenticated"):
+            return jsonify({"error": "Session expired. Please refresh the page and log in again."}), 401
+        return await f(*args, **kwargs)
     return decorated_function
 
 
 @app.route("/health")
-def health():
+async def health():
     """Unauthenticated health-check endpoint for Render."""
     return "ok", 200
 
 
 @app.route("/login", methods=["GET", "POST"])
-def login():
+async def login():
     if request.method == "POST":
-        password = request.form.get("password", "")
-        if password == SITE_PASSWORD:
+        form = await request.form
+        password = form.get("password", "")
+        if hmac.compare_digest(password.encode(), SITE_PASSWORD_BYTES):
             session.permanent = True
             session["authenticated"] = True
             return redirect(url_for("home"))
         else:
-            flash("Incorrect password. Please try again.", "error")
-    return render_template("login.html")
+            await flash("Incorrect password. Please try again.", "error")
+    return await render_template("login.html")
 
 
 @app.route("/logout")
-def logout():
+async def logout():
     session.clear()
     return redirect(url_for("login"))
 
 
 @app.route("/")
-@login_required
-def home():
-    return render_template("home.html", personas=PERSONAS)
+@web_login_required
+async def home():
+    return await render_template("home.html", personas=PERSONAS)
 
 
 @app.route("/chat/<persona_id>")
-@login_required
-def chat(persona_id):
+@web_login_required
+async def chat(persona_id):
     if persona_id not in PERSONAS:
         return redirect(url_for("home"))
     persona = PERSONAS[persona_id]
-    return render_template("chat.html", persona=persona, personas=PERSONAS)
+    return await render_template("chat.html", persona=persona, personas=PERSONAS)
 
 
 def _sse_event(data):
     """Format a dict as an SSE data line."""
-    return f"data: {json.dumps(data)}\n\n"
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+# Fixed framing around a token payload, so only the JSON string varies.
+_SSE_TOKEN_PRE = b'data: {"token":'
+_SSE_TOKEN_POST = b"}\n\n"
+
+
+def _sse_token(text):
+    """Format a single streamed token as an SSE data line."""
+    return b"".join((_SSE_TOKEN_PRE, orjson.dumps(text), _SSE_TOKEN_POST))
+
+
+_SSE_DONE = _sse_event({"done": True})
+
+
+# Streamed frames are coalesced until one of these limits is reached, so a
+# reply goes out in a few larger writes rather than one write per token.
+SSE_FLUSH_BYTES = 4096
+SSE_FLUSH_INTERVAL = 0.02  # seconds
+
+
+async def _coalesce_sse(frames):
+    """Batch small SSE frames into larger chunks before they hit the wire.
+
+    Frames are held until SSE_FLUSH_BYTES have built up or SSE_FLUSH_INTERVAL
+    has passed since the last write, so buffered text is sent on time even
+    if upstream goes quiet.
+    """
+    frames = frames.__aiter__()
+    buf = bytearray()
+    last_flush = time.monotonic()
+    # The next frame is fetched in its own task so waiting on it can time
+    # out without cancelling the upstream generator mid-frame.
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(frames.__anext__())
+            if buf:
+                timeout = max(0, last_flush + SSE_FLUSH_INTERVAL - time.monotonic())
+                done, _ = await asyncio.wait((pending,), timeout=timeout)
+                if not done:
+                    yield bytes(buf)
+                    buf.clear()
+                    last_flush = time.monotonic()
+                    continue
+            try:
+                frame = await pending
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+            buf += frame
+            now = time.monotonic()
+            if len(buf) >= SSE_FLUSH_BYTES or now - last_flush >= SSE_FLUSH_INTERVAL:
+                yield bytes(buf)
+                buf.clear()
+                last_flush = now
+    finally:
+        if pending is not None:
+            pending.cancel()
+    # Whatever is left includes the final done/error event.
+    if buf:
+        yield bytes(buf)
+
+
+# Completed replies, keyed on everything that shapes them. Identical chats
+# (e.g. the first turn with a given persona) replay from memory instead of
+# going back to the model.
+_response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL) \
+    if RESPONSE_CACHE_SIZE > 0 else None
+
+
+def _response_cache_key(persona_id, api_messages):
+    model = ANTHROPIC_MODEL if RESOLVED_PROVIDER == "anthropic" else OPENAI_MODEL
+    payload = orjson.dumps(
+        [persona_id, RESOLVED_PROVIDER, model, api_messages],
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+async def _replay_sse(payload):
+    """Stream a cached reply back in one go."""
+    yield payload
+
+
+async def _record_sse(key, frames):
+    """Pass frames through, caching the stream if it finishes cleanly."""
+    recorded = bytearray()
+    last = None
+    async for frame in frames:
+        recorded += frame
+        last = frame
+        yield frame
+    if last == _SSE_DONE:
+        _response_cache[key] = bytes(recorded)
+
+
+_MESSAGE_KEYS = {"role", "content"}
+
+
+def _is_valid_message(msg):
+    """Check a chat message is a {role, content} dict of UTF-8-encodable strings."""
+    if not isinstance(msg, dict) or msg.keys() != _MESSAGE_KEYS:
+        return False
+    role = msg["role"]
+    content = msg["content"]
+    if not isinstance(role, str) or not isinstance(content, str):
+        return False
+    # JSON allows lone surrogate escapes such as \ud800, but neither the SDKs
+    # nor orjson can encode them.
+    try:
+        role.encode()
+        content.encode()
+    except UnicodeEncodeError:
+        return False
+    return True
 
 
 @app.route("/api/chat", methods=["POST"])
-@login_required
-def api_chat():
-    data = request.json
+@api_login_required
+async def api_chat():
+    data = await request.get_json(silent=True)
     if not data:
         return jsonify({"error": "Invalid request body."}), 400
 
@@ -192,39 +445,43 @@ def api_chat():
     if not messages:
         return jsonify({"error": "No messages provided."}), 400
 
-    persona = PERSONAS[persona_id]
-    dossier = json.dumps(persona, indent=2)
-    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(dossier=dossier)
+    # Validated once here so the list can go to the SDKs as-is.
+    if not isinstance(messages, list) or not all(map(_is_valid_message, messages)):
+        return jsonify({"error": "Invalid message format."}), 400
 
-    provider = AI_PROVIDER.lower()
+    system_prompt = PERSONA_PROMPTS[persona_id]
 
-    # Auto-detect provider based on available keys
-    if provider == "openai" and not OPENAI_API_KEY:
-        if ANTHROPIC_API_KEY:
-            provider = "anthropic"
-    elif provider == "anthropic" and not ANTHROPIC_API_KEY:
-        if OPENAI_API_KEY:
-            provider = "openai"
+    if PROVIDER_ERROR:
+        logger.error("%s API key is not configured", RESOLVED_PROVIDER)
+        return jsonify(PROVIDER_ERROR[0]), PROVIDER_ERROR[1]
 
-    # Validate that the selected provider has an API key
-    if provider == "anthropic" and not ANTHROPIC_API_KEY:
-        logger.error("Anthropic API key is not configured")
-        return jsonify({"error": "The Claude API key is not configured. Please set ANTHROPIC_API_KEY in the environment."}), 503
-    if provider == "openai" and not OPENAI_API_KEY:
-        logger.error("OpenAI API key is not configured")
-        return jsonify({"error": "The OpenAI API key is not configured. Please set OPENAI_API_KEY in the environment."}), 503
-
-    api_messages = []
-    for msg in messages:
-        api_messages.append({"role": msg["role"], "content": msg["content"]})
+    cache_key = None
+    if _response_cache is not None:
+        try:
+            cache_key = _response_cache_key(persona_id, messages)
+        except orjson.JSONEncodeError:
+            return jsonify({"error": "Invalid message format."}), 400
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            return _sse_response(_replay_sse(cached))
 
-    if provider == "anthropic":
-        gen = _stream_anthropic(system_prompt, api_messages)
+    if RESOLVED_PROVIDER == "anthropic":
+        gen = _stream_anthropic(system_prompt, messages)
     else:
-        gen = _stream_openai(system_prompt, api_messages)
+        gen = _stream_openai(system_prompt, messages)
+
+    if cache_key is not None:
+        gen = _record_sse(cache_key, gen)
+
+    return _sse_response(gen)
+
 
+def _sse_response(gen):
+    """Wrap an SSE frame generator in a streaming response."""
+    # The stream yields ready-encoded bytes, which Quart hands to the ASGI
+    # server as-is — no per-chunk encode and no request context needed.
     return Response(
-        gen,
+        _coalesce_sse(gen),
         mimetype="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -233,36 +490,43 @@ def api_chat():
     )
 
 
-def _stream_anthropic(system_prompt, api_messages):
-    import anthropic
+# Anthropic error classes, bound once so the handlers below need no
+# module attribute lookups when a stream is set up.
+_ANTH_AUTH = anthropic.AuthenticationError
+_ANTH_RATE = anthropic.RateLimitError
+_ANTH_CONNECTION = anthropic.APIConnectionError
+_ANTH_TIMEOUT = anthropic.APITimeoutError
+_ANTH_BAD_REQUEST = anthropic.BadRequestError
+_ANTH_STATUS = anthropic.APIStatusError
 
+
+async def _stream_anthropic(system_prompt, api_messages):
     try:
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=120.0)
-        with client.messages.stream(
+        async with _anthropic_client.messages.stream(
             model=ANTHROPIC_MODEL,
             max_tokens=2048,
             system=system_prompt,
             messages=api_messages,
         ) as stream:
-            for text in stream.text_stream:
-                yield _sse_event({"token": text})
-        yield _sse_event({"done": True})
-    except anthropic.AuthenticationError:
+            async for text in stream.text_stream:
+                yield _sse_token(text)
+        yield _SSE_DONE
+    except _ANTH_AUTH:
         logger.error("Anthropic authentication failed")
         yield _sse_event({"error": "The Anthropic API key is invalid. Please check ANTHROPIC_API_KEY in the server environment."})
-    except anthropic.RateLimitError:
+    except _ANTH_RATE:
         logger.warning("Anthropic rate limit hit")
         yield _sse_event({"error": "Rate limit exceeded. Please wait a moment and try again."})
-    except anthropic.APIConnectionError as e:
+    except _ANTH_CONNECTION as e:
         logger.error("Cannot reach Anthropic API: %s", e)
         yield _sse_event({"error": "Could not connect to the Claude API. Please try again later."})
-    except anthropic.APITimeoutError:
+    except _ANTH_TIMEOUT:
         logger.error("Anthropic API request timed out")
         yield _sse_event({"error": "The Claude API request timed out. Please try again."})
-    except anthropic.BadRequestError as e:
+    except _ANTH_BAD_REQUEST as e:
         logger.error("Anthropic bad request (model=%s): %s", ANTHROPIC_MODEL, e)
         yield _sse_event({"error": f"Claude API rejected the request: {e}"})
-    except anthropic.APIStatusError as e:
+    except _ANTH_STATUS as e:
         logger.error("Anthropic API error %d: %s", e.status_code, e.message)
         yield _sse_event({"error": f"Claude API error ({e.status_code}): {e.message}"})
     except Exception as e:
@@ -270,90 +534,95 @@ def _stream_anthropic(system_prompt, api_messages):
         yield _sse_event({"error": f"AI service error: {e}"})
 
 
-def _stream_openai(system_prompt, api_messages):
+async def _stream_openai(system_prompt, api_messages):
     try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=OPENAI_API_KEY, timeout=120.0)
-        oai_messages = [{"role": "system", "content": system_prompt}] + api_messages
+        oai_messages = [{"role": "system", "content": system_prompt}, *api_messages]
 
-        stream = client.chat.completions.create(
+        stream = await _openai_client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=oai_messages,
             temperature=0.7,
             max_tokens=2048,
             stream=True,
         )
-        for chunk in stream:
+        async for chunk in stream:
             delta = chunk.choices[0].delta
             if delta.content:
-                yield _sse_event({"token": delta.content})
-        yield _sse_event({"done": True})
+                yield _sse_token(delta.content)
+        yield _SSE_DONE
     except Exception as e:
         logger.exception("OpenAI streaming error")
         yield _sse_event({"error": f"AI service error: {e}"})
 
 
 @app.route("/api/status")
-@login_required
-def api_status():
+@api_login_required
+async def api_status():
     """Check whether the AI backend is configured and ready."""
-    provider = AI_PROVIDER.lower()
-    if provider == "anthropic" and not ANTHROPIC_API_KEY:
-        if OPENAI_API_KEY:
-            provider = "openai"
-    elif provider == "openai" and not OPENAI_API_KEY:
-        if ANTHROPIC_API_KEY:
-            provider = "anthropic"
-
-    has_key = (provider == "anthropic" and bool(ANTHROPIC_API_KEY)) or \
-              (provider == "openai" and bool(OPENAI_API_KEY))
-
     return jsonify({
-        "ready": has_key,
-        "provider": provider,
+        "ready": bool(RESOLVED_API_KEY),
+        "provider": RESOLVED_PROVIDER,
     })
 
 
-@app.route("/api/test")
-@login_required
-def api_test():
-    """Test the AI API connection with a minimal request."""
-    provider = AI_PROVIDER.lower()
-    if provider == "anthropic" and not ANTHROPIC_API_KEY:
-        if OPENAI_API_KEY:
-            provider = "openai"
-    elif provider == "openai" and not OPENAI_API_KEY:
-        if ANTHROPIC_API_KEY:
-            provider = "anthropic"
+# /api/test results are shared: concurrent callers (monitors, probes) wait
+# on one upstream call, and its result is reused for a short window.
+API_TEST_CACHE_TTL = 30.0  # seconds
+_api_test_inflight = None
+_api_test_cached = None  # (expires_at, (body, status))
 
-    if provider == "anthropic" and not ANTHROPIC_API_KEY:
-        return jsonify({"ok": False, "error": "ANTHROPIC_API_KEY is not set in the environment."}), 503
-    if provider == "openai" and not OPENAI_API_KEY:
-        return jsonify({"ok": False, "error": "OPENAI_API_KEY is not set in the environment."}), 503
 
+async def _probe_provider():
+    """Make a minimal upstream call and return a (body, status) pair."""
     try:
-        if provider == "anthropic":
-            import anthropic
-            client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=15.0)
-            response = client.messages.create(
+        if RESOLVED_PROVIDER == "anthropic":
+            client = _anthropic_client.with_options(timeout=15.0)
+            response = await client.messages.create(
                 model=ANTHROPIC_MODEL,
                 max_tokens=10,
                 messages=[{"role": "user", "content": "Say OK"}],
             )
-            return jsonify({"ok": True, "provider": "anthropic", "model": ANTHROPIC_MODEL, "reply": response.content[0].text})
+            return {"ok": True, "provider": "anthropic", "model": ANTHROPIC_MODEL, "reply": response.content[0].text}, 200
         else:
-            from openai import OpenAI
-            client = OpenAI(api_key=OPENAI_API_KEY, timeout=15.0)
-            response = client.chat.completions.create(
+            client = _openai_client.with_options(timeout=15.0)
+            response = await client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=[{"role": "user", "content": "Say OK"}],
                 max_tokens=10,
             )
-            return jsonify({"ok": True, "provider": "openai", "model": OPENAI_MODEL, "reply": response.choices[0].message.content})
+            return {"ok": True, "provider": "openai", "model": OPENAI_MODEL, "reply": response.choices[0].message.content}, 200
     except Exception as e:
-        logger.exception("API test failed (provider=%s)", provider)
-        return jsonify({"ok": False, "provider": provider, "error": f"{type(e).__name__}: {e}"}), 500
+        logger.exception("API test failed (provider=%s)", RESOLVED_PROVIDER)
+        return {"ok": False, "provider": RESOLVED_PROVIDER, "error": f"{type(e).__name__}: {e}"}, 500
+
+
+async def _shared_probe():
+    global _api_test_inflight, _api_test_cached
+    try:
+        result = await _probe_provider()
+        _api_test_cached = (time.monotonic() + API_TEST_CACHE_TTL, result)
+        return result
+    finally:
+        _api_test_inflight = None
+
+
+@app.route("/api/test")
+@api_login_required
+async def api_test():
+    """Test the AI API connection with a minimal request."""
+    global _api_test_inflight
+    if PROVIDER_ERROR:
+        return jsonify({"ok": False, **PROVIDER_ERROR[0]}), PROVIDER_ERROR[1]
+
+    if _api_test_cached and _api_test_cached[0] > time.monotonic():
+        body, status = _api_test_cached[1]
+        return jsonify(body), status
+
+    if _api_test_inflight is None:
+        _api_test_inflight = asyncio.ensure_future(_shared_probe())
+    # shield() keeps one caller disconnecting from cancelling everyone's probe.
+    body, status = await asyncio.shield(_api_test_inflight)
+    return jsonify(body), status
 
 
 if __name__ == "__main__":
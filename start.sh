@@ -2,4 +2,7 @@
 export PYTHONPATH="${PWD}/vendor"
 # Use the Python path saved at build time; fall back to python3 on PATH.
 PYTHON=$(cat .python_path 2>/dev/null || which python3 2>/dev/null || echo python3)
-exec "$PYTHON" -m gunicorn app:app --bind "0.0.0.0:${PORT:-5000}" --workers "${WEB_CONCURRENCY:-2}" --threads 4 --timeout 300 --preload
+# app.py imports the Anthropic/OpenAI SDKs and builds their clients at
+# module scope, so each worker pays that cost while booting rather than
+# on its first chat request.
+exec "$PYTHON" -m hypercorn app:app --bind "0.0.0.0:${PORT:-5000}" --workers "${WEB_CONCURRENCY:-2}" --worker-class asyncio
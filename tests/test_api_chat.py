@@ -0,0 +1,34 @@
+import asyncio
+
+from app import PERSONAS, app
+
+
+def _post_chat(body):
+    async def post():
+        client = app.test_client()
+        async with client.session_transaction() as session:
+            session["authenticated"] = True
+        response = await client.post(
+            "/api/chat", data=body, headers={"Content-Type": "application/json"}
+        )
+        return response.status_code, await response.get_json()
+
+    return asyncio.run(post())
+
+
+def test_lone_surrogate_content_is_rejected():
+    persona_id = next(iter(PERSONAS))
+    body = (
+        '{"persona_id": "%s", "messages": [{"role": "user", "content": "hi \\ud800"}]}'
+        % persona_id
+    )
+    assert _post_chat(body) == (400, {"error": "Invalid message format."})
+
+
+def test_non_string_content_is_rejected():
+    persona_id = next(iter(PERSONAS))
+    body = (
+        '{"persona_id": "%s", "messages": [{"role": "user", "content": 12345678901234567890123}]}'
+        % persona_id
+    )
+    assert _post_chat(body) == (400, {"error": "Invalid message format."})